@@ -7,23 +7,51 @@ from __future__ import annotations
 
 import argparse
 import csv
-from collections import defaultdict
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 
 
+class _BulkWriter:
+    """Appends rows through one open handle and a shared csv.writer"""
+
+    def __init__(self, writer) -> None:
+        self._writer = writer
+
+    def add(
+        self,
+        amount: float,
+        category: str,
+        description: str,
+        date: str | None = None,
+    ) -> None:
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        self._writer.writerow((date, f"{amount:.2f}", category, description))
+
+
 class ExpenseStorage:
     """Handles CSV read/write operations"""
 
     def __init__(self, filepath: str = "expenses.csv"):
         self.filepath = Path(filepath)
+        self.tombpath = self.filepath.with_suffix(".tombstones")
+        # open() on a Path goes through __fspath__ dispatch every call;
+        # cache the plain strings for the read/write hot paths.
+        self._fp = str(self.filepath)
+        self._tomb_fp = str(self.tombpath)
         self.headers = ["date", "amount", "category", "description"]
+        self._cache: list[dict] | None = None
+        self._cache_mtime: float | None = None
         self._ensure_file_exists()
 
     def _ensure_file_exists(self) -> None:
         if not self.filepath.exists():
-            with self.filepath.open("w", newline="", encoding="utf-8") as f:
-                csv.DictWriter(f, fieldnames=self.headers).writeheader()
+            with open(self._fp, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerow(self.headers)
 
     def save_expense(
         self,
@@ -33,48 +61,151 @@ class ExpenseStorage:
         date: str | None = None,
     ) -> bool:
         try:
-            date = date or datetime.now().strftime("%Y-%m-%d")
-            row = {
-                "date": date,
-                "amount": f"{amount:.2f}",
-                "category": category,
-                "description": description,
-            }
-            with self.filepath.open("a", newline="", encoding="utf-8") as f:
-                csv.DictWriter(f, fieldnames=self.headers).writerow(row)
+            with self.bulk_writer() as writer:
+                writer.add(amount, category, description, date)
             return True
         except Exception as e:
             print(f"Error saving expense: {e}")
             return False
 
-    def load_expenses(self) -> list[dict]:
+    @contextmanager
+    def bulk_writer(self) -> Iterator[_BulkWriter]:
+        """Batch many adds through a single open file handle."""
+        try:
+            with open(self._fp, "a", newline="", encoding="utf-8") as f:
+                yield _BulkWriter(csv.writer(f))
+        finally:
+            self._invalidate_cache()
+
+    def _invalidate_cache(self) -> None:
+        self._cache = None
+        self._cache_mtime = None
+
+    def _load_tombstones(self) -> set[int]:
+        """Physical row indices marked deleted but not yet compacted."""
         try:
-            with self.filepath.open(encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                return [
-                    {**row, "amount": float(row["amount"])}
-                    for row in reader
-                    if row.get("amount")
-                ]
+            with open(self._tomb_fp, encoding="utf-8") as f:
+                return {int(line) for line in f if line.strip()}
         except FileNotFoundError:
-            return []
+            return set()
+
+    def iter_expenses(self) -> Iterator[dict]:
+        """Yield expense rows one at a time so filters can stream."""
+        tombstones = self._load_tombstones()
+        try:
+            with open(self._fp, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader, None)  # header
+                for physical, row in enumerate(reader):
+                    if physical in tombstones:
+                        continue
+                    if len(row) == 4 and row[1]:
+                        date, amount, category, description = row
+                        # amount stays a string; only the math paths
+                        # pay for float() conversion.
+                        yield {
+                            "date": date,
+                            "amount": amount,
+                            "category": category,
+                            "description": description,
+                            "_cat_lc": category.lower(),
+                        }
+        except FileNotFoundError:
+            return
         except Exception as e:
             print(f"Error loading expenses: {e}")
-            return []
+
+    def load_columns(self) -> tuple[list[str], array, list[str], list[str]]:
+        """Columnar view of the file: dates, amounts ('d' array),
+        categories, descriptions. Amounts live in a packed double array,
+        so whole-file aggregation skips per-row dicts and boxed floats."""
+        dates: list[str] = []
+        amounts = array("d")
+        categories: list[str] = []
+        descriptions: list[str] = []
+        add_date = dates.append
+        add_amount = amounts.append
+        add_category = categories.append
+        add_description = descriptions.append
+        tombstones = self._load_tombstones()
+        try:
+            with open(self._fp, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader, None)  # header
+                for physical, row in enumerate(reader):
+                    if physical in tombstones:
+                        continue
+                    if len(row) == 4 and row[1]:
+                        add_date(row[0])
+                        add_amount(float(row[1]))
+                        add_category(row[2])
+                        add_description(row[3])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading expenses: {e}")
+        return dates, amounts, categories, descriptions
+
+    def load_expenses(self) -> list[dict]:
+        try:
+            mtime = self.filepath.stat().st_mtime
+        except OSError:
+            mtime = None
+        if self._cache is None or mtime != self._cache_mtime:
+            self._cache = list(self.iter_expenses())
+            self._cache_mtime = mtime
+        return list(self._cache)
 
     def delete_expense(self, index: int) -> bool:
-        expenses = self.load_expenses()
-        if 0 <= index < len(expenses):
-            expenses.pop(index)
-            self._overwrite_expenses(expenses)
-            return True
-        return False
+        # Append-only delete: record the physical row in the tombstone
+        # file and defer the O(N) rewrite until enough rows are dead.
+        if index < 0:
+            return False
+        tombstones = self._load_tombstones()
+        target = None
+        try:
+            with open(self._fp, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader, None)  # header
+                visible = -1
+                for physical, row in enumerate(reader):
+                    if physical in tombstones or len(row) != 4 or not row[1]:
+                        continue
+                    visible += 1
+                    if visible == index:
+                        target = physical
+                        break
+        except FileNotFoundError:
+            return False
+        if target is None:
+            return False
+        with open(self._tomb_fp, "a", encoding="utf-8") as f:
+            f.write(f"{target}\n")
+        self._invalidate_cache()
+        self._maybe_compact()
+        return True
+
+    def _maybe_compact(self) -> None:
+        """Rewrite the CSV once tombstones exceed 10% of all rows."""
+        tombstones = self._load_tombstones()
+        if not tombstones:
+            return
+        live = list(self.iter_expenses())
+        if len(tombstones) <= 0.1 * (len(live) + len(tombstones)):
+            return
+        self.tombpath.unlink(missing_ok=True)
+        self._overwrite_expenses(live)
 
     def _overwrite_expenses(self, expenses: list[dict]) -> None:
-        with self.filepath.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=self.headers)
-            writer.writeheader()
-            writer.writerows(expenses)
+        rows = [
+            (e["date"], e["amount"], e["category"], e["description"])
+            for e in expenses
+        ]
+        with open(self._fp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.headers)
+            writer.writerows(rows)
+        self._invalidate_cache()
 
 
 class ExpenseAnalyzer:
@@ -82,41 +213,89 @@ class ExpenseAnalyzer:
 
     @staticmethod
     def filter_by_month(
-        expenses: list[dict], month: int, year: int | None = None
-    ) -> list[dict]:
+        expenses: Iterable[dict], month: int, year: int | None = None
+    ) -> Iterator[dict]:
         if year is None:
             year = datetime.now().year
-        return [
-            e
-            for e in expenses
-            if (d := datetime.strptime(e["date"], "%Y-%m-%d"))
-            and d.month == month
-            and d.year == year
-        ]
+        prefix = f"{year:04d}-{month:02d}-"
+        return (e for e in expenses if e["date"].startswith(prefix))
 
     @staticmethod
-    def filter_by_category(expenses: list[dict], category: str) -> list[dict]:
+    def filter_by_category(expenses: Iterable[dict], category: str) -> Iterator[dict]:
         cat = category.lower()
-        return [e for e in expenses if e["category"].lower() == cat]
+        return (e for e in expenses if e["_cat_lc"] == cat)
+
+    @staticmethod
+    def apply_filters(
+        expenses: Iterable[dict],
+        month: int | None = None,
+        year: int | None = None,
+        category: str | None = None,
+    ) -> list[dict]:
+        """Apply the month and category filters in a single traversal."""
+        preds = []
+        if month:
+            if year is None:
+                year = datetime.now().year
+            prefix = f"{year:04d}-{month:02d}-"
+            preds.append(lambda e: e["date"].startswith(prefix))
+        if category:
+            cat = category.lower()
+            preds.append(lambda e: e["_cat_lc"] == cat)
+        if not preds:
+            return list(expenses)
+        if len(preds) == 1:
+            pred = preds[0]
+            return [e for e in expenses if pred(e)]
+        return [e for e in expenses if all(p(e) for p in preds)]
 
     @staticmethod
-    def group_by_category(expenses: list[dict]) -> dict[str, float]:
-        groups = defaultdict(float)
+    def group_by_category(expenses: Iterable[dict]) -> dict[str, float]:
+        groups: dict[str, float] = {}
+        get = groups.get
         for e in expenses:
-            groups[e["category"]] += e["amount"]
-        return dict(groups)
+            c = e["category"]
+            groups[c] = get(c, 0.0) + float(e["amount"])
+        return groups
 
     @staticmethod
-    def calculate_summary(expenses: list[dict]) -> dict[str, float]:
-        if not expenses:
+    def group_columns(
+        categories: list[str], amounts: Iterable[float]
+    ) -> dict[str, float]:
+        """group_by_category over parallel columns from load_columns."""
+        groups: dict[str, float] = {}
+        get = groups.get
+        for c, a in zip(categories, amounts):
+            groups[c] = get(c, 0.0) + a
+        return groups
+
+    @staticmethod
+    def calculate_summary(expenses: Iterable[dict]) -> dict[str, float]:
+        return ExpenseAnalyzer.summarize_amounts(
+            float(e["amount"]) for e in expenses
+        )
+
+    @staticmethod
+    def summarize_amounts(amounts: Iterable[float]) -> dict[str, float]:
+        total = 0.0
+        count = 0
+        mx = float("-inf")
+        mn = float("inf")
+        for a in amounts:
+            total += a
+            count += 1
+            if a > mx:
+                mx = a
+            if a < mn:
+                mn = a
+        if not count:
             return {"total": 0, "count": 0, "average": 0, "max": 0, "min": 0}
-        amounts = [e["amount"] for e in expenses]
         return {
-            "total": sum(amounts),
-            "count": len(amounts),
-            "average": sum(amounts) / len(amounts),
-            "max": max(amounts),
-            "min": min(amounts),
+            "total": total,
+            "count": count,
+            "average": total / count,
+            "max": mx,
+            "min": mn,
         }
 
 
@@ -131,64 +310,78 @@ class ExpenseFormatter:
             print("No expenses found.")
             return
 
-        print("\n" + "-" * 80)
         hdr = f"{'#':<4} " if show_index else ""
         hdr += f"{'Date':<12} {'Amount':>12} {'Category':<15} Description"
-        print(hdr)
-        print("-" * 80)
-
-        for i, e in enumerate(expenses):
-            line = f"{i:<4} " if show_index else ""
-            line += (
-                f"{e['date']:<12} "
-                f"{ExpenseFormatter.CURRENCY}{e['amount']:>9.2f} "
-                f"{e['category']:<15} {e['description']}"
+        out = ["", "-" * 80, hdr, "-" * 80]
+
+        # amounts are stored pre-formatted with two decimals
+        fmt = "%-12s " + ExpenseFormatter.CURRENCY + "%9s %-15s %s"
+        if show_index:
+            fmt = "%-4d " + fmt
+            out.extend(
+                fmt % (i, e["date"], e["amount"], e["category"], e["description"])
+                for i, e in enumerate(expenses)
             )
-            print(line)
-        print("-" * 80 + "\n")
+        else:
+            out.extend(
+                fmt % (e["date"], e["amount"], e["category"], e["description"])
+                for e in expenses
+            )
+        out.extend(["-" * 80, ""])
+        sys.stdout.write("\n".join(out) + "\n")
 
     @staticmethod
-    def format_summary(summary: dict[str, float], expenses: list[dict]) -> None:
+    def format_summary(
+        summary: dict[str, float],
+        dates: list[str],
+        by_cat: dict[str, float],
+    ) -> None:
         if not summary["count"]:
             print("No expenses to summarize.")
             return
 
         c = ExpenseFormatter.CURRENCY
-        print("\n" + "=" * 60)
-        print("EXPENSE SUMMARY".center(60))
-        print("=" * 60)
-        print(f"Total:          {c}{summary['total']:>10,.2f}")
-        print(f"Count:         {summary['count']:>11}")
-        print(f"Average:       {c}{summary['average']:>10,.2f}")
-        print(f"Highest:       {c}{summary['max']:>10,.2f}")
-        print(f"Lowest:        {c}{summary['min']:>10,.2f}")
-
-        if expenses:
-            dates = [datetime.strptime(e["date"], "%Y-%m-%d") for e in expenses]
-            days = (max(dates) - min(dates)).days + 1
+        out = [
+            "",
+            "=" * 60,
+            "EXPENSE SUMMARY".center(60),
+            "=" * 60,
+            f"Total:          {c}{summary['total']:>10,.2f}",
+            f"Count:         {summary['count']:>11}",
+            f"Average:       {c}{summary['average']:>10,.2f}",
+            f"Highest:       {c}{summary['max']:>10,.2f}",
+            f"Lowest:        {c}{summary['min']:>10,.2f}",
+        ]
+
+        if dates:
+            # ISO dates compare lexicographically, so only the two
+            # extremes need datetime conversion.
+            first = datetime.fromisoformat(min(dates))
+            last = datetime.fromisoformat(max(dates))
+            days = (last - first).days + 1
             daily = summary["total"] / days if days > 0 else 0
-            print(f"Daily average: {c}{daily:>10,.2f}")
+            out.append(f"Daily average: {c}{daily:>10,.2f}")
 
-        print("=" * 60)
+        out.append("=" * 60)
 
-        by_cat = ExpenseAnalyzer.group_by_category(expenses)
         if by_cat and summary["total"] > 0:
-            print("\nCategory breakdown:")
-            print("-" * 60)
-            for cat, amt in sorted(by_cat.items(), key=lambda x: x[1], reverse=True):
+            out.extend(["", "Category breakdown:", "-" * 60])
+            for cat, amt in sorted(by_cat.items(), key=itemgetter(1), reverse=True):
                 pct = amt / summary["total"] * 100
-                print(f"{cat:<20} {c}{amt:>11,.2f}  ({pct:5.1f}%)")
-            print("-" * 60)
+                out.append(f"{cat:<20} {c}{amt:>11,.2f}  ({pct:5.1f}%)")
+            out.append("-" * 60)
+
+        sys.stdout.write("\n".join(out) + "\n")
 
 
 def validate_amount(s: str) -> float:
     try:
         v = float(s)
-        if v <= 0:
-            raise ValueError
-        return v
     except ValueError:
         raise argparse.ArgumentTypeError(f"Invalid positive amount: {s}")
+    if v <= 0:
+        raise argparse.ArgumentTypeError(f"Invalid positive amount: {s}")
+    return v
 
 
 def main() -> None:
@@ -238,24 +431,28 @@ def main() -> None:
             print("✓ Added" if ok else "✗ Failed")
 
         case "list":
-            ex = storage.load_expenses()
-            if args.month:
-                ex = analyzer.filter_by_month(ex, args.month, args.year)
-            if args.category:
-                ex = analyzer.filter_by_category(ex, args.category)
+            ex = analyzer.apply_filters(
+                storage.iter_expenses(), args.month, args.year, args.category
+            )
             formatter.format_table(ex, args.show_index)
             if ex:
-                total = sum(e["amount"] for e in ex)
+                total = sum(float(e["amount"]) for e in ex)
                 print(f"Total: {formatter.CURRENCY}{total:,.2f} ({len(ex)} items)")
 
         case "summary":
-            ex = storage.load_expenses()
-            if args.month:
-                ex = analyzer.filter_by_month(ex, args.month, args.year)
-            if args.category:
-                ex = analyzer.filter_by_category(ex, args.category)
-            sm = analyzer.calculate_summary(ex)
-            formatter.format_summary(sm, ex)
+            if args.month or args.category:
+                ex = analyzer.apply_filters(
+                    storage.iter_expenses(), args.month, args.year, args.category
+                )
+                sm = analyzer.calculate_summary(ex)
+                dates = [e["date"] for e in ex]
+                by_cat = analyzer.group_by_category(ex)
+            else:
+                # Whole-file summary: aggregate over packed columns.
+                dates, amounts, cats, _ = storage.load_columns()
+                sm = analyzer.summarize_amounts(amounts)
+                by_cat = analyzer.group_columns(cats, amounts)
+            formatter.format_summary(sm, dates, by_cat)
 
         case "delete":
             ok = storage.delete_expense(args.index)